@@ -13,99 +13,78 @@ Usage:
     python mcp_to_skill.py --mcp-config mcp-server-config.json --output-dir ./skills/my-mcp-skill
 """
 
+import os
+import sys
+import copy
 import json
 import asyncio
+import functools
+import logging
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, ClassVar, Optional, Tuple
 import argparse
 
+# orjson is optional; it is much faster than json for the indented output
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class MCPSkillGenerator:
-    """Generate a Skill from an MCP server configuration."""
-    
-    def __init__(self, mcp_config: Dict[str, Any], output_dir: Path):
-        self.mcp_config = mcp_config
-        self.output_dir = Path(output_dir)
-        self.server_name = mcp_config.get('name', 'unnamed-mcp-server')
-        
-    async def generate(self):
-        """Generate the complete skill structure."""
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        print(f"Generating skill for MCP server: {self.server_name}")
-        
-        # 1. Introspect MCP server to get tool list
-        tools = await self._get_mcp_tools()
-        
-        # 2. Generate SKILL.md
-        self._generate_skill_md(tools)
-        
-        # 3. Generate executor script
-        self._generate_executor()
-        
-        # 4. Generate config file
-        self._generate_config()
-        
-        # 5. Generate package.json (if needed)
-        self._generate_package_json()
-        
-        print(f"✓ Skill generated at: {self.output_dir}")
-        print(f"✓ Tools available: {len(tools)}")
-        
-    async def _get_mcp_tools(self) -> List[Dict[str, Any]]:
-        """Connect to MCP server and get available tools."""
-        command = self.mcp_config.get('command', '')
-        
-        print(f"Introspecting MCP server: {command}")
-        
-        # In a real implementation, this would:
-        # 1. Start the MCP server process
-        # 2. Send tools/list request
-        # 3. Parse the response
-        
-        # Mock response for demonstration
-        return [
-            {
-                "name": "example_tool",
-                "description": "An example tool from the MCP server",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "param1": {"type": "string", "description": "First parameter"}
-                    },
-                    "required": ["param1"]
-                }
-            }
-        ]
+
+logger = logging.getLogger("mcp_to_skill")
+
+# Files copied verbatim into every generated skill
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj as indented UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _write_if_changed(path: Path, content: bytes) -> bool:
+    """Write content to path unless the file already holds exactly that.
+
+    Returns True if the file was written. Unchanged files are left alone so
+    their mtimes stay put and regenerating a skill does not touch the disk.
+    """
+    try:
+        if path.stat().st_size == len(content) and path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(content)
+    return True
+
+
+def _is_plain_name(name: str) -> bool:
+    """Return True if name can be used as a single file or directory name.
     
-    def _generate_skill_md(self, tools: List[Dict[str, Any]]):
-        """Generate the SKILL.md file with instructions for Claude."""
-        
-        # Create tool list for Claude
-        tool_list = "\n".join([
-            f"- `{t['name']}`: {t.get('description', 'No description')}"
-            for t in tools
-        ])
-        
-        # Count tools
-        tool_count = len(tools)
-        
-        content = f"""---
-name: {self.server_name}
-description: Dynamic access to {self.server_name} MCP server ({tool_count} tools)
+    Names come from server configs and tool lists, so anything that would
+    leave its directory (separators, "..") or create a hidden file is refused.
+    """
+    return bool(name) and Path(name).name == name and not name.startswith(".")
+
+
+# SKILL.md body, filled in by MCPSkillGenerator._generate_skill_md
+_SKILL_MD_TEMPLATE = """---
+name: {server_name}
+description: Dynamic access to {server_name} MCP server ({tool_count} tools)
 version: 1.0.0
 ---
 
-# {self.server_name} Skill
+# {server_name} Skill
 
-This skill provides dynamic access to the {self.server_name} MCP server without loading all tool definitions into context.
+This skill provides dynamic access to the {server_name} MCP server without loading all tool definitions into context.
 
 ## Context Efficiency
 
 Traditional MCP approach:
 - All {tool_count} tools loaded at startup
-- Estimated context: {tool_count * 500} tokens
+- Estimated context: {preload_tokens} tokens
 
 This skill approach:
 - Metadata only: ~100 tokens
@@ -166,7 +145,7 @@ This loads ONLY that tool's schema, not all tools.
 
 ### Example 1: Simple tool call
 
-User: "Use {self.server_name} to do X"
+User: "Use {server_name} to do X"
 
 Your workflow:
 1. Identify tool: `example_tool`
@@ -200,200 +179,173 @@ Context usage comparison for this skill:
 
 | Scenario | MCP (preload) | Skill (dynamic) |
 |----------|---------------|-----------------|
-| Idle | {tool_count * 500} tokens | 100 tokens |
-| Active | {tool_count * 500} tokens | 5k tokens |
-| Executing | {tool_count * 500} tokens | 0 tokens |
+| Idle | {preload_tokens} tokens | 100 tokens |
+| Active | {preload_tokens} tokens | 5k tokens |
+| Executing | {preload_tokens} tokens | 0 tokens |
 
-Savings: ~{int((1 - 5000/(tool_count * 500)) * 100)}% reduction in typical usage
+Savings: ~{savings_pct}% reduction in typical usage
 
 ---
 
 *This skill was auto-generated from an MCP server configuration.*
 *Generator: mcp_to_skill.py*
-"""
-        
-        skill_path = self.output_dir / "SKILL.md"
-        skill_path.write_text(content)
-        print(f"✓ Generated: {skill_path}")
-    
-    def _generate_executor(self):
-        """Generate the executor script that communicates with MCP server."""
-        
-        executor_code = '''#!/usr/bin/env python3
-"""
-MCP Skill Executor
-==================
-Handles dynamic communication with the MCP server.
 """
 
-import json
-import sys
-import asyncio
-import argparse
-from pathlib import Path
-
-# Check if mcp package is available
-try:
-    from mcp import ClientSession, StdioServerParameters
-    from mcp.client.stdio import stdio_client
-    HAS_MCP = True
-except ImportError:
-    HAS_MCP = False
-    print("Warning: mcp package not installed. Install with: pip install mcp", file=sys.stderr)
 
-
-class MCPExecutor:
-    """Execute MCP tool calls dynamically."""
+class MCPSkillGenerator:
+    """Generate a Skill from an MCP server configuration."""
     
-    def __init__(self, server_config):
-        if not HAS_MCP:
-            raise ImportError("mcp package is required. Install with: pip install mcp")
-            
-        self.server_config = server_config
-        self.session = None
-        self.stdio_transport = None
+    # Contents of templates/executor.py, read once on first use
+    _EXECUTOR_BYTES: ClassVar[Optional[bytes]] = None
+    
+    def __init__(self, mcp_config: Dict[str, Any], output_dir: Path):
+        self.mcp_config = mcp_config
+        self.output_dir = Path(output_dir)
+        self.server_name = mcp_config.get('name', 'unnamed-mcp-server')
+    
+    async def generate(self):
+        """Generate the complete skill structure.
         
-    async def connect(self):
-        """Connect to MCP server."""
-        server_params = StdioServerParameters(
-            command=self.server_config["command"],
-            args=self.server_config.get("args", []),
-            env=self.server_config.get("env")
-        )
+        Only the MCP introspection is awaited; that is the one real I/O wait
+        worth overlapping when several servers are converted concurrently.
+        """
+        logger.info("[%s] Generating skill for MCP server", self.server_name)
+        
+        # 1. Introspect MCP server to get tool list
+        tools = await self._get_mcp_tools()
+        
+        self.write_skill(tools)
+    
+    def write_skill(self, tools: List[Dict[str, Any]]):
+        """Write all skill files for an already fetched tool list.
+        
+        These are small local file writes, so they run synchronously rather
+        than as coroutines.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 2. Generate SKILL.md
+        self._generate_skill_md(tools)
+        
+        # 3. Generate per-tool schema files
+        self._generate_schemas(tools)
+        
+        # 4. Generate executor script
+        self._generate_executor()
+        
+        # 5. Generate config file
+        self._generate_config()
         
-        stdio_result = await stdio_client(server_params)
-        self.stdio_transport = stdio_result
-        read_stream, write_stream = stdio_result
+        # 6. Generate package.json (if needed)
+        self._generate_package_json()
         
-        self.session = ClientSession(read_stream, write_stream)
-        await self.session.initialize()
+        logger.info("[%s] ✓ Skill generated at: %s (%d tools)",
+                    self.server_name, self.output_dir, len(tools))
         
-    async def list_tools(self):
-        """Get list of available tools."""
-        if not self.session:
-            await self.connect()
-            
-        response = await self.session.list_tools()
+    async def _get_mcp_tools(self) -> List[Dict[str, Any]]:
+        """Connect to MCP server and get available tools."""
+        command = self.mcp_config.get('command', '')
+        
+        logger.debug("[%s] Introspecting MCP server: %s", self.server_name, command)
+        
+        # In a real implementation, this would:
+        # 1. Start the MCP server process
+        # 2. Send tools/list request
+        # 3. Parse the response
+        
+        # Mock response for demonstration
         return [
             {
-                "name": tool.name,
-                "description": tool.description
+                "name": "example_tool",
+                "description": "An example tool from the MCP server",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "param1": {"type": "string", "description": "First parameter"}
+                    },
+                    "required": ["param1"]
+                }
             }
-            for tool in response.tools
         ]
+    
+    def _generate_skill_md(self, tools: List[Dict[str, Any]]):
+        """Generate the SKILL.md file with instructions for Claude."""
         
-    async def describe_tool(self, tool_name: str):
-        """Get detailed schema for a specific tool."""
-        if not self.session:
-            await self.connect()
-            
-        response = await self.session.list_tools()
-        for tool in response.tools:
-            if tool.name == tool_name:
-                return {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "inputSchema": tool.inputSchema
-                }
-        return None
+        # Create tool list for Claude
+        tool_list = "\n".join(
+            f"- `{t['name']}`: {t.get('description', 'No description')}"
+            for t in tools
+        )
         
-    async def call_tool(self, tool_name: str, arguments: dict):
-        """Execute a tool call."""
-        if not self.session:
-            await self.connect()
-            
-        response = await self.session.call_tool(tool_name, arguments)
-        return response.content
+        # Count tools and estimate what preloading them would cost
+        tool_count = len(tools)
+        preload_tokens = tool_count * 500
+        savings_pct = 0 if tool_count == 0 else max(0, int((1 - 5000 / preload_tokens) * 100))
         
-    async def close(self):
-        """Close MCP connection."""
-        if self.session:
-            try:
-                await self.session.__aexit__(None, None, None)
-            except:
-                pass
-
-
-async def main():
-    parser = argparse.ArgumentParser(description="MCP Skill Executor")
-    parser.add_argument("--call", help="JSON tool call to execute")
-    parser.add_argument("--describe", help="Get tool schema")
-    parser.add_argument("--list", action="store_true", help="List all tools")
-    
-    args = parser.parse_args()
-    
-    # Load server config
-    config_path = Path(__file__).parent / "mcp-config.json"
-    if not config_path.exists():
-        print(f"Error: Configuration file not found: {config_path}", file=sys.stderr)
-        sys.exit(1)
+        content = _SKILL_MD_TEMPLATE.format(
+            server_name=self.server_name,
+            tool_count=tool_count,
+            tool_list=tool_list,
+            preload_tokens=preload_tokens,
+            savings_pct=savings_pct
+        )
         
-    with open(config_path) as f:
-        config = json.load(f)
+        skill_path = self.output_dir / "SKILL.md"
+        self._write_file(skill_path, content.encode("utf-8"))
     
-    if not HAS_MCP:
-        print("Error: mcp package not installed", file=sys.stderr)
-        print("Install with: pip install mcp", file=sys.stderr)
-        sys.exit(1)
+    def _generate_schemas(self, tools: List[Dict[str, Any]]):
+        """Write each tool's full schema to schemas/<tool_name>.json.
+        
+        SKILL.md only lists tool names and descriptions; the executor reads
+        these files for --describe so it does not have to ask the server.
+        """
+        schemas_dir = self.output_dir / "schemas"
+        schemas_dir.mkdir(exist_ok=True)
+        
+        tool_names = set()
+        updated = 0
+        for tool in tools:
+            if not _is_plain_name(tool['name']):
+                logger.warning("[%s] Skipping schema for tool %r: not a plain file name",
+                               self.server_name, tool['name'])
+                continue
+            tool_names.add(tool['name'])
+            schema = {
+                "name": tool['name'],
+                "description": tool.get('description', 'No description'),
+                "inputSchema": tool.get('inputSchema', {})
+            }
+            if _write_if_changed(schemas_dir / f"{tool['name']}.json", _dumps(schema)):
+                updated += 1
+        
+        # Drop schemas of tools the server no longer provides
+        for stale in schemas_dir.glob("*.json"):
+            if stale.stem not in tool_names:
+                stale.unlink()
+        
+        logger.debug("[%s] ✓ Generated: %s (%d schemas, %d updated)",
+                     self.server_name, schemas_dir, len(tool_names), updated)
     
-    executor = MCPExecutor(config)
+    @classmethod
+    def _executor_template(cls) -> bytes:
+        """Return the executor script source shared by all skills."""
+        if cls._EXECUTOR_BYTES is None:
+            cls._EXECUTOR_BYTES = (TEMPLATES_DIR / "executor.py").read_bytes()
+        return cls._EXECUTOR_BYTES
     
-    try:
-        if args.list:
-            tools = await executor.list_tools()
-            print(json.dumps(tools, indent=2))
-            
-        elif args.describe:
-            schema = await executor.describe_tool(args.describe)
-            if schema:
-                print(json.dumps(schema, indent=2))
-            else:
-                print(f"Tool not found: {args.describe}", file=sys.stderr)
-                sys.exit(1)
-                
-        elif args.call:
-            call_data = json.loads(args.call)
-            result = await executor.call_tool(
-                call_data["tool"],
-                call_data.get("arguments", {})
-            )
-            
-            # Format result
-            if isinstance(result, list):
-                for item in result:
-                    if hasattr(item, 'text'):
-                        print(item.text)
-                    else:
-                        print(json.dumps(item.__dict__ if hasattr(item, '__dict__') else item, indent=2))
-            else:
-                print(json.dumps(result.__dict__ if hasattr(result, '__dict__') else result, indent=2))
-        else:
-            parser.print_help()
-            
-    except Exception as e:
-        print(f"Error: {str(e)}", file=sys.stderr)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
-        sys.exit(1)
-    finally:
-        await executor.close()
-
-
-if __name__ == "__main__":
-    asyncio.run(main())
-'''
+    def _generate_executor(self):
+        """Generate the executor script that communicates with MCP server."""
         
         executor_path = self.output_dir / "executor.py"
-        executor_path.write_text(executor_code)
+        self._write_file(executor_path, self._executor_template())
         executor_path.chmod(0o755)
-        print(f"✓ Generated: {executor_path}")
     
     def _generate_config(self):
         """Save MCP server config for the executor."""
         config_path = self.output_dir / "mcp-config.json"
-        with open(config_path, 'w') as f:
-            json.dump(self.mcp_config, f, indent=2)
-        print(f"✓ Generated: {config_path}")
+        if self._write_file(config_path, _dumps(self.mcp_config)):
+            # The executor's cached tool list came from the previous server
+            (self.output_dir / ".tools_cache.json").unlink(missing_ok=True)
     
     def _generate_package_json(self):
         """Generate package.json for dependencies."""
@@ -407,43 +359,147 @@ if __name__ == "__main__":
         }
         
         package_path = self.output_dir / "package.json"
-        with open(package_path, 'w') as f:
-            json.dump(package, f, indent=2)
-        print(f"✓ Generated: {package_path}")
+        self._write_file(package_path, _dumps(package))
+
+    def _write_file(self, path: Path, content: bytes) -> bool:
+        """Write one generated file, skipping it if it is already up to date.
+        
+        Returns True if the file was written.
+        """
+        if _write_if_changed(path, content):
+            logger.debug("[%s] ✓ Generated: %s", self.server_name, path)
+            return True
+        logger.debug("[%s] Unchanged: %s", self.server_name, path)
+        return False
+
+
+class ServerNotFoundError(KeyError):
+    """A server asked for with --server is not in the config file."""
+
+
+@functools.lru_cache(maxsize=8)
+def _load_mcp_config(config_path: str, server_names: Optional[Tuple[str, ...]],
+                     mtime_ns: int) -> Tuple[Dict[str, Any], ...]:
+    """Parse a config file; mtime_ns is part of the cache key so edits are picked up."""
+    data = json.loads(Path(config_path).read_bytes())
+    
+    if "mcpServers" not in data:
+        if server_names is not None and data.get('name') not in server_names:
+            raise ServerNotFoundError(f"Server {data.get('name')!r} does not match --server")
+        return (data,)
+    
+    mcp_servers = data["mcpServers"]
+    if server_names is None:
+        return tuple(dict(config, name=name) for name, config in mcp_servers.items())
+    
+    # Look requested servers up directly instead of scanning the whole map
+    missing = [name for name in server_names if name not in mcp_servers]
+    if missing:
+        raise ServerNotFoundError(f"Server(s) not found in {config_path}: {', '.join(missing)}")
+    return tuple(dict(mcp_servers[name], name=name) for name in server_names)
 
 
-async def convert_mcp_to_skill(mcp_config_path: str, output_dir: str):
-    """Convert an MCP server configuration to a Skill."""
+def parse_mcp_config(config_path: str,
+                     server_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Load the MCP server configs from a config file.
+    
+    Accepts either a single server config or a Claude Desktop style file with
+    an "mcpServers" map, in which case each entry is named after its key.
+    If server_names is given, only those servers are returned and a
+    ServerNotFoundError is raised for any that are missing.
+    Repeated calls for an unchanged file reuse the parsed result; callers get
+    deep copies, so changing them never alters the cached configs.
+    """
+    config_path = os.path.abspath(config_path)
+    if server_names is not None:
+        # Drop duplicates but keep the order the servers were asked for
+        server_names = tuple(dict.fromkeys(server_names))
+    servers = _load_mcp_config(config_path, server_names, os.stat(config_path).st_mtime_ns)
+    return [copy.deepcopy(server) for server in servers]
+
+
+async def convert_mcp_to_skill(mcp_config_path: str, output_dir: str,
+                               server_names: Optional[List[str]] = None) -> bool:
+    """Convert MCP server configurations to Skills.
+    
+    A single server is written to output_dir itself; several servers are
+    introspected concurrently and each written to output_dir/<name>.
+    server_names restricts conversion to those servers of the config file.
+    Servers whose name is not a plain directory name are skipped.
+    Returns False if any server failed to convert or was skipped.
+    """
     
     # Load MCP config
-    with open(mcp_config_path) as f:
-        mcp_config = json.load(f)
+    servers = parse_mcp_config(mcp_config_path, server_names)
+    if not servers:
+        logger.error("✗ No MCP servers found in %s", mcp_config_path)
+        return False
+    output_base = Path(output_dir)
     
-    # Generate skill
-    generator = MCPSkillGenerator(mcp_config, Path(output_dir))
-    await generator.generate()
+    skipped = []
+    if len(servers) == 1:
+        generators = [MCPSkillGenerator(servers[0], output_base)]
+    else:
+        generators = []
+        for config in servers:
+            name = config.get('name', 'unnamed')
+            # Server names become directories under output_dir
+            if not _is_plain_name(name):
+                logger.error("✗ Skipped server %r: name is not a plain directory name", name)
+                skipped.append(name)
+                continue
+            generators.append(MCPSkillGenerator(config, output_base / name))
     
-    print("\n" + "="*60)
-    print("✓ Skill generation complete!")
-    print("="*60)
-    print(f"\nGenerated files:")
-    print(f"  - SKILL.md (instructions for Claude)")
-    print(f"  - executor.py (MCP communication handler)")
-    print(f"  - mcp-config.json (MCP server configuration)")
-    print(f"  - package.json (dependencies)")
+    # Generate skills; each generator writes only to its own directory
+    results = await asyncio.gather(
+        *(generator.generate() for generator in generators),
+        return_exceptions=True
+    )
     
-    print(f"\nTo use this skill:")
-    print(f"1. Install dependencies:")
-    print(f"   cd {output_dir}")
-    print(f"   pip install mcp")
-    print(f"\n2. Copy to Claude skills directory:")
-    print(f"   cp -r {output_dir} ~/.claude/skills/")
-    print(f"\n3. Claude will discover it automatically")
+    failed = []
+    for generator, result in zip(generators, results):
+        if isinstance(result, BaseException):
+            failed.append(generator)
+            logger.error("✗ [%s] Generation failed: %s", generator.server_name, result)
+    succeeded = [g for g in generators if g not in failed]
     
-    print(f"\nContext savings:")
-    print(f"  Before (MCP): All tools preloaded (~10k-50k tokens)")
-    print(f"  After (Skill): ~100 tokens until used")
-    print(f"  Reduction: ~90-99%")
+    if not succeeded:
+        return False
+    
+    # Emit the summary as one record rather than a write per line
+    lines = [
+        "",
+        "=" * 60,
+        f"✓ Skill generation complete! ({len(succeeded)} of {len(servers)} skills)",
+        "=" * 60,
+        "",
+        "Generated skills:",
+        *(f"  - {generator.output_dir}" for generator in succeeded),
+        "",
+        "Each skill contains:",
+        "  - SKILL.md (instructions for Claude)",
+        "  - executor.py (MCP communication handler)",
+        "  - schemas/ (per-tool schemas for --describe)",
+        "  - mcp-config.json (MCP server configuration)",
+        "  - package.json (dependencies)",
+        "",
+        "To use these skills:",
+        "1. Install dependencies:",
+        "   pip install mcp",
+        "",
+        "2. Copy to Claude skills directory:",
+        *(f"   cp -r {generator.output_dir} ~/.claude/skills/" for generator in succeeded),
+        "",
+        "3. Claude will discover them automatically",
+        "",
+        "Context savings:",
+        "  Before (MCP): All tools preloaded (~10k-50k tokens)",
+        "  After (Skill): ~100 tokens until used",
+        "  Reduction: ~90-99%",
+    ]
+    logger.info("\n".join(lines))
+    
+    return not failed and not skipped
 
 
 def main():
@@ -454,17 +510,43 @@ def main():
     parser.add_argument(
         "--mcp-config",
         required=True,
-        help="Path to MCP server configuration JSON"
+        help="Path to MCP server configuration JSON (single server or an \"mcpServers\" map)"
     )
     parser.add_argument(
         "--output-dir",
         required=True,
-        help="Output directory for generated skill"
+        help="Output directory for generated skill (one subdirectory per server for multi-server configs)"
+    )
+    parser.add_argument(
+        "--server",
+        help="Only convert these servers from an \"mcpServers\" config (comma-separated)"
+    )
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Show every generated file"
     )
     
     args = parser.parse_args()
     
-    asyncio.run(convert_mcp_to_skill(args.mcp_config, args.output_dir))
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    
+    server_names = None
+    if args.server is not None:
+        server_names = [name.strip() for name in args.server.split(",") if name.strip()]
+        if not server_names:
+            parser.error("no server names given")
+    
+    try:
+        succeeded = asyncio.run(
+            convert_mcp_to_skill(args.mcp_config, args.output_dir, server_names)
+        )
+    except ServerNotFoundError as e:
+        parser.error(e.args[0])
+    if not succeeded:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
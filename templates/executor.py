@@ -0,0 +1,711 @@
+#!/usr/bin/env python3
+"""
+MCP Skill Executor
+==================
+Handles dynamic communication with the MCP server.
+
+The first invocation starts a background daemon that keeps a single MCP
+session open and listens on a per-skill Unix socket (see _socket_path). Every
+later invocation is a thin client that forwards its request to the daemon,
+so the server spawn and MCP handshake are paid once rather than per call.
+The daemon exits on its own after IDLE_TIMEOUT seconds without requests.
+"""
+
+import json
+import os
+import sys
+import stat
+import time
+import socket
+import argparse
+import hashlib
+import tempfile
+import subprocess
+import importlib.util
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+# Check if mcp package is available. It is only imported (see _import_mcp)
+# by processes that talk to the server, so answers served from the local
+# caches skip importing mcp and asyncio altogether.
+HAS_MCP = importlib.util.find_spec("mcp") is not None
+
+# orjson is optional; it is much faster than json for large tool results
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+SKILL_DIR = Path(__file__).resolve().parent
+CONFIG_PATH = SKILL_DIR / "mcp-config.json"
+LOCK_PATH = SKILL_DIR / ".mcp.lock"
+DAEMON_LOG_PATH = SKILL_DIR / ".mcp-daemon.log"
+TOOLS_CACHE_PATH = SKILL_DIR / ".tools_cache.json"
+SCHEMAS_DIR = SKILL_DIR / "schemas"
+
+# Seconds the daemon stays alive without receiving a request
+IDLE_TIMEOUT = 300
+# Seconds a client waits for a freshly spawned daemon to accept connections
+STARTUP_TIMEOUT = 30
+# Seconds between the daemon's idle and skill-regeneration checks
+WATCH_INTERVAL = 1
+# Seconds a cached tools/list response stays valid (override with MCP_TOOLS_TTL)
+DEFAULT_TOOLS_TTL = 3600
+
+
+
+def _socket_path():
+    """Return a short per-skill socket path outside the skill directory.
+
+    AF_UNIX paths are limited to about 100 bytes, which a deeply nested skill
+    directory easily exceeds, so the socket lives in the user's runtime
+    directory under a name derived from SKILL_DIR.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        uid = os.getuid() if hasattr(os, "getuid") else "user"
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"mcp-skills-{uid}")
+    key = hashlib.sha256(str(SKILL_DIR).encode("utf-8")).hexdigest()[:16]
+    return Path(runtime_dir) / f"mcp-{key}.sock"
+
+
+SOCKET_PATH = _socket_path()
+
+
+def _socket_dir_is_private():
+    """Create SOCKET_PATH's directory if needed and check that only we can use it.
+
+    The fallback directory under the shared temp dir has a predictable name,
+    so another user could create it first and listen in the daemon's place.
+    It must be a real directory (not a symlink) owned by us with no group or
+    other permissions.
+    """
+    try:
+        SOCKET_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(SOCKET_PATH.parent)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and st.st_mode & 0o077 == 0
+    )
+
+# Server config and connection parameters, loaded once per process
+_CONFIG = None
+_SERVER_PARAMS = None
+
+
+def _dumps(obj):
+    """Serialize obj as indented JSON text."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def _loads(data):
+    """Parse JSON from bytes or text."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_line(obj):
+    """Serialize obj as one compact, newline-terminated line of UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _tools_ttl():
+    """Return the tool cache TTL, honouring the MCP_TOOLS_TTL override."""
+    try:
+        return float(os.environ.get("MCP_TOOLS_TTL", DEFAULT_TOOLS_TTL))
+    except ValueError:
+        return DEFAULT_TOOLS_TTL
+
+
+def _cache_expired(cache):
+    """Return True once a tool cache is older than its TTL."""
+    return time.time() - cache.get("fetched_at", 0) >= cache.get("ttl", 0)
+
+
+def load_tools_cache():
+    """Return the cached {fetched_at, ttl, tools}, or None if missing or expired."""
+    try:
+        cache = _loads(TOOLS_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+    if _cache_expired(cache):
+        return None
+    return cache
+
+
+def save_tools_cache(tools):
+    """Write the tool list cache, atomically replacing any previous one.
+
+    The cache is only an optimization, so if the skill directory cannot be
+    written the tools are returned uncached.
+    """
+    cache = {"fetched_at": time.time(), "ttl": _tools_ttl(), "tools": tools}
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=SKILL_DIR, prefix=".tools_cache.", suffix=".tmp")
+    except OSError:
+        return cache
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_dumps_line(cache))
+        os.replace(tmp_path, TOOLS_CACHE_PATH)
+    except OSError:
+        os.unlink(tmp_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return cache
+
+
+def load_schema(tool_name):
+    """Return the schema written for tool_name at generation time, if any.
+
+    The generator only writes schemas for names that are a plain file name,
+    and the same rule keeps lookups inside SCHEMAS_DIR.
+    """
+    if not tool_name or Path(tool_name).name != tool_name or tool_name.startswith("."):
+        return None
+    try:
+        return _loads((SCHEMAS_DIR / f"{tool_name}.json").read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _import_mcp():
+    """Import the mcp client API into module globals on first use."""
+    global ClientSession, StdioServerParameters, stdio_client, McpError, _UNSENT_ERRORS
+    if not HAS_MCP:
+        raise ImportError("mcp package is required. Install with: pip install mcp")
+    from anyio import BrokenResourceError, ClosedResourceError
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+    from mcp.shared.exceptions import McpError
+    # Raised by the session's write stream when a request could not be sent
+    _UNSENT_ERRORS = (BrokenResourceError, ClosedResourceError)
+
+
+def tool_summaries(tools):
+    """Reduce full tool definitions to the name/description pairs --list shows."""
+    return [
+        {
+            "name": tool["name"],
+            "description": tool["description"]
+        }
+        for tool in tools
+    ]
+
+
+def load_config():
+    """Return the parsed mcp-config.json, reading it only on first use."""
+    global _CONFIG
+    if _CONFIG is None:
+        _CONFIG = _loads(CONFIG_PATH.read_bytes())
+    return _CONFIG
+
+
+def get_server_params():
+    """Return the StdioServerParameters for the configured server."""
+    global _SERVER_PARAMS
+    if _SERVER_PARAMS is None:
+        _import_mcp()
+        config = load_config()
+        _SERVER_PARAMS = StdioServerParameters(
+            command=config["command"],
+            args=config.get("args", []),
+            env=config.get("env")
+        )
+    return _SERVER_PARAMS
+
+
+@asynccontextmanager
+async def mcp_connection(server_params):
+    """Start the MCP server and yield an initialized client session."""
+    async with stdio_client(server_params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            yield session
+
+
+class MCPExecutor:
+    """Execute MCP tool calls dynamically."""
+
+    def __init__(self, server_params):
+        _import_mcp()
+
+        self.server_params = server_params
+        self.session = None
+        self._session_task = None
+        self._closing = None
+        self._connect_lock = None
+        # Tool definitions indexed by name, plus the cache entry they came from
+        self._tools_by_name = None
+        self._tools_cache = None
+
+    async def connect(self):
+        """Connect to MCP server.
+
+        The connection is held open by a task of its own, so whichever request
+        finds it broken can close it and open a new one.
+        """
+        import asyncio
+
+        ready = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._session_task = asyncio.create_task(self._hold_session(ready, self._closing))
+        self.session = await ready
+
+    async def _hold_session(self, ready, closing):
+        """Open the MCP connection, hand it to connect() and keep it until closing is set."""
+        try:
+            async with mcp_connection(self.server_params) as session:
+                ready.set_result(session)
+                await closing.wait()
+        except Exception as e:
+            if ready.done():
+                raise
+            ready.set_exception(e)
+        finally:
+            if not ready.done():
+                ready.cancel()
+
+    async def _ensure_session(self):
+        """Return the open session, connecting first if there is none."""
+        if self._connect_lock is None:
+            import asyncio
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if not self.session:
+                await self.connect()
+        return self.session
+
+    async def _request(self, method: str, *args, idempotent: bool = False):
+        """Send one request to the server, reconnecting once if the session broke.
+
+        A daemon outlives a crashed server process, so after a transport
+        failure the session is closed and the next request reconnects. The
+        request itself is retried on the fresh connection only if it is
+        idempotent or never left this process; a tool call that may have
+        reached the server is not run a second time. Errors the server itself
+        reports (McpError) are raised as they are.
+        """
+        for attempt in range(2):
+            session = await self._ensure_session()
+            try:
+                return await getattr(session, method)(*args)
+            except McpError:
+                raise
+            except Exception as e:
+                if self.session is session:
+                    await self.close()
+                if attempt or not (idempotent or isinstance(e, _UNSENT_ERRORS)):
+                    raise
+
+    async def load_tools(self, refresh: bool = False):
+        """Get tool definitions keyed by name, refetched once the TTL expires.
+
+        The index is kept in memory, so a long-lived daemon only touches the
+        disk cache or the server again after the cached entry expires.
+        """
+        if not refresh and self._tools_by_name is not None and not _cache_expired(self._tools_cache):
+            return self._tools_by_name
+
+        cache = None if refresh else load_tools_cache()
+        if cache is None:
+            response = await self._request("list_tools", idempotent=True)
+            tools = [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "inputSchema": tool.inputSchema
+                }
+                for tool in response.tools
+            ]
+            cache = save_tools_cache(tools)
+
+        self._tools_cache = cache
+        self._tools_by_name = {tool["name"]: tool for tool in cache["tools"]}
+        return self._tools_by_name
+
+    async def list_tools(self, refresh: bool = False):
+        """Get list of available tools."""
+        tools_by_name = await self.load_tools(refresh)
+        return tool_summaries(tools_by_name.values())
+
+    async def describe_tool(self, tool_name: str, refresh: bool = False):
+        """Get detailed schema for a specific tool."""
+        if not refresh:
+            schema = load_schema(tool_name)
+            if schema is not None:
+                return schema
+
+        tools_by_name = await self.load_tools(refresh)
+        return tools_by_name.get(tool_name)
+
+    async def call_tool(self, tool_name: str, arguments: dict):
+        """Execute a tool call, yielding each content item of the result."""
+        response = await self._request("call_tool", tool_name, arguments)
+        for item in response.content:
+            yield item
+
+    async def close(self):
+        """Close MCP connection."""
+        self.session = None
+        if self._session_task:
+            self._closing.set()
+            try:
+                await self._session_task
+            except Exception:
+                pass
+            self._session_task = None
+
+
+def _to_jsonable(item):
+    """Convert an MCP content item into plain JSON-compatible data."""
+    if hasattr(item, 'model_dump'):
+        return item.model_dump(mode="json", exclude_none=True)
+    if hasattr(item, '__dict__'):
+        return item.__dict__
+    return item
+
+
+async def dispatch(executor, request):
+    """Run a single request against the executor, yielding response messages.
+
+    A call yields one {"item": ...} message per result item as soon as it is
+    available. Every request ends with a final {"ok": ..., ...} message.
+    """
+    op = request.get("op")
+    refresh = request.get("refresh", False)
+    try:
+        if op == "list":
+            result = await executor.list_tools(refresh)
+        elif op == "describe":
+            result = await executor.describe_tool(request["tool"], refresh)
+        elif op == "call":
+            async for item in executor.call_tool(
+                request["tool"],
+                request.get("arguments", {})
+            ):
+                yield {"item": _to_jsonable(item)}
+            result = None
+        else:
+            yield {"ok": False, "error": f"Unknown operation: {op}"}
+            return
+    except Exception as e:
+        yield {"ok": False, "error": str(e)}
+        return
+    yield {"ok": True, "result": result}
+
+
+def _connect():
+    """Open a client connection to the daemon socket."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(SOCKET_PATH))
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def _daemon_lock_held():
+    """Return True if a daemon holds LOCK_PATH, i.e. is serving or starting up."""
+    import fcntl
+
+    with open(LOCK_PATH, "ab") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return False
+
+
+def _source_mtimes():
+    """Return the mtimes of the config and executor a daemon was started from."""
+    mtimes = []
+    for path in (CONFIG_PATH, Path(__file__)):
+        try:
+            mtimes.append(path.stat().st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _spawn_daemon():
+    """Start a background daemon process for this skill."""
+    with open(DAEMON_LOG_PATH, "ab") as log:
+        return subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--daemon"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+            start_new_session=True
+        )
+
+
+def request_messages(sock, request):
+    """Send a request over sock and yield each response message as it arrives."""
+    with sock:
+        sock.sendall(_dumps_line(request))
+        with sock.makefile("rb") as stream:
+            for line in stream:
+                message = _loads(line)
+                yield message
+                if "item" not in message:
+                    return
+    raise RuntimeError("MCP daemon closed the connection without a response")
+
+
+def connect_daemon():
+    """Connect to the daemon, starting the daemon first if needed."""
+    try:
+        return _connect()
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+
+    daemon = _spawn_daemon()
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            return _connect()
+        except (FileNotFoundError, ConnectionRefusedError):
+            status = daemon.poll()
+            if status is not None:
+                if status != 0:
+                    raise RuntimeError(f"MCP daemon failed to start, see {DAEMON_LOG_PATH}")
+                # Our daemon lost the lock to another one and exited cleanly.
+                # Keep waiting for the winner, or start over if it is gone too.
+                if not _daemon_lock_held():
+                    daemon = _spawn_daemon()
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"MCP daemon did not start within {STARTUP_TIMEOUT}s, see {DAEMON_LOG_PATH}")
+            time.sleep(0.05)
+
+
+async def run_direct(server_params, request):
+    """Handle a request in-process, when the daemon cannot be used."""
+    executor = MCPExecutor(server_params)
+    try:
+        return [message async for message in dispatch(executor, request)]
+    finally:
+        await executor.close()
+
+
+async def serve(server_params):
+    """Keep one MCP session open and answer requests on SOCKET_PATH.
+
+    Only the daemon holding an exclusive lock on LOCK_PATH starts the server
+    and binds the socket; one that loses the race exits immediately.
+    """
+    import fcntl
+
+    lock_file = open(LOCK_PATH, "ab")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return
+
+    try:
+        await _serve_locked(server_params)
+    finally:
+        # Closing the file releases the lock
+        lock_file.close()
+
+
+async def _serve_locked(server_params):
+    """Run the daemon; the caller holds the daemon lock."""
+    import asyncio
+
+    if not _socket_dir_is_private():
+        raise RuntimeError(f"Refusing to serve from {SOCKET_PATH.parent}: not a private directory")
+
+    started_from = _source_mtimes()
+    executor = MCPExecutor(server_params)
+    await executor.connect()
+    await executor.load_tools()
+
+    last_active = time.monotonic()
+    in_flight = 0
+
+    async def handle(reader, writer):
+        nonlocal last_active, in_flight
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                in_flight += 1
+                try:
+                    try:
+                        request = _loads(line)
+                    except ValueError as e:
+                        writer.write(_dumps_line({"ok": False, "error": f"Invalid request: {e}"}))
+                    else:
+                        async for message in dispatch(executor, request):
+                            writer.write(_dumps_line(message))
+                            await writer.drain()
+                    await writer.drain()
+                finally:
+                    in_flight -= 1
+                    last_active = time.monotonic()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # Any socket file left behind belongs to a daemon that no longer holds
+    # the lock, so nobody is listening on it
+    if SOCKET_PATH.exists():
+        SOCKET_PATH.unlink()
+    server = await asyncio.start_unix_server(handle, path=str(SOCKET_PATH))
+    socket_inode = SOCKET_PATH.stat().st_ino
+
+    try:
+        while True:
+            idle = time.monotonic() - last_active >= IDLE_TIMEOUT
+            # A regenerated skill gets a fresh daemon with its new config and
+            # executor code, started by the next client
+            stale = _source_mtimes() != started_from
+            if (idle or stale) and in_flight == 0:
+                break
+            await asyncio.sleep(WATCH_INTERVAL)
+    finally:
+        server.close()
+        # Only remove the socket file if it is still the one bound above
+        try:
+            if SOCKET_PATH.stat().st_ino == socket_inode:
+                SOCKET_PATH.unlink()
+        except FileNotFoundError:
+            pass
+        await executor.close()
+
+
+def _write_item(item):
+    """Write one call result item to stdout and flush it immediately."""
+    out = sys.stdout.buffer
+    if isinstance(item, dict) and "text" in item:
+        out.write(item["text"].encode("utf-8") + b"\n")
+    else:
+        out.write(_dumps_line(item))
+    out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Skill Executor")
+    parser.add_argument("--call", help="JSON tool call to execute")
+    parser.add_argument("--describe", help="Get tool schema")
+    parser.add_argument("--list", action="store_true", help="List all tools")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached tool list and re-fetch it")
+    parser.add_argument("--daemon", action="store_true", help="Run the persistent MCP session (started automatically)")
+
+    args = parser.parse_args()
+
+    # The config itself is only read by the process that talks to the server
+    if not CONFIG_PATH.exists():
+        print(f"Error: Configuration file not found: {CONFIG_PATH}", file=sys.stderr)
+        sys.exit(1)
+
+    # Fast paths: answer from the local caches without importing mcp or
+    # asyncio, contacting the daemon, or starting the server
+    if not args.refresh and (args.list or args.describe):
+        if args.describe:
+            schema = load_schema(args.describe)
+            if schema is not None:
+                print(_dumps(schema))
+                return
+
+        cache = load_tools_cache()
+        if cache is not None:
+            if args.list:
+                print(_dumps(tool_summaries(cache["tools"])))
+                return
+            for tool in cache["tools"]:
+                if tool["name"] == args.describe:
+                    print(_dumps(tool))
+                    return
+            # A fresh cache lists every tool, so the server has no such tool
+            print(f"Tool not found: {args.describe}", file=sys.stderr)
+            sys.exit(1)
+
+    if not HAS_MCP:
+        print("Error: mcp package not installed", file=sys.stderr)
+        print("Install with: pip install mcp", file=sys.stderr)
+        sys.exit(1)
+
+    import asyncio
+
+    if args.daemon:
+        asyncio.run(serve(get_server_params()))
+        return
+
+    try:
+        if args.list:
+            request = {"op": "list", "refresh": args.refresh}
+        elif args.describe:
+            request = {"op": "describe", "tool": args.describe, "refresh": args.refresh}
+        elif args.call:
+            call_data = _loads(args.call)
+            request = {
+                "op": "call",
+                "tool": call_data["tool"],
+                "arguments": call_data.get("arguments", {})
+            }
+        else:
+            parser.print_help()
+            return
+
+        messages = None
+        if hasattr(socket, "AF_UNIX"):
+            if not _socket_dir_is_private():
+                print(f"Warning: {SOCKET_PATH.parent} is not a private directory, connecting directly", file=sys.stderr)
+            else:
+                try:
+                    messages = request_messages(connect_daemon(), request)
+                except OSError as e:
+                    # e.g. an unusable socket path; answer this request in-process
+                    print(f"Warning: MCP daemon unavailable ({e}), connecting directly", file=sys.stderr)
+        if messages is None:
+            messages = asyncio.run(run_direct(get_server_params(), request))
+
+        for message in messages:
+            if "item" in message:
+                _write_item(message["item"])
+            else:
+                response = message
+
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        import traceback
+        traceback.print_exc(file=sys.stderr)
+        sys.exit(1)
+
+    if not response.get("ok"):
+        print(f"Error: {response.get('error')}", file=sys.stderr)
+        sys.exit(1)
+
+    result = response["result"]
+    if args.list:
+        print(_dumps(result))
+
+    elif args.describe:
+        if result:
+            print(_dumps(result))
+        else:
+            print(f"Tool not found: {args.describe}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()